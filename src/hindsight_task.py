@@ -1,9 +1,16 @@
 import os
+import selectors
 import shutil
 import subprocess
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from pathlib import Path, PureWindowsPath
+from functools import lru_cache
+from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
+from uuid import uuid4
 
 from celery import signals
 from celery.utils.log import get_task_logger
@@ -34,17 +41,73 @@ TASK_METADATA = {
         {
             "name": "browser_profile",
             "label": "Browser profile (Default Folder) to parse",
-            "description": "Insert an exact browser profile default folder to parse (e.g., C:\\Users\Ryan\AppData\Local\Google\Chrome\\User Data\Default), matching is case sensitive. Don't leave blank.",
+            "description": "Insert an exact browser profile default folder to parse (e.g., C:\\Users\Ryan\AppData\Local\Google\Chrome\\User Data\Default), matching is case-insensitive. Don't leave blank.",
             "type": "text",
             "required": True,
         },
     ],
 }
 
+# Mount the input ZIP read-only with ratarmount (FUSE) instead of extracting it. Requires
+# /dev/fuse and CAP_SYS_ADMIN in the container; falls back to extraction on failure.
+_MOUNT_ZIP = os.getenv("OPENRELIK_HINDSIGHT_MOUNT_ZIP") == "1"
+# Seconds to wait for ratarmount to mount or unmount before giving up.
+_MOUNT_TIMEOUT = 600
+
+# Worker threads used to decompress ZIP members in parallel.
+_EXTRACT_WORKERS = os.cpu_count() or 1
+# Buffer size for streaming decompressed members; larger chunks mean bigger inflate() calls.
+_COPY_BUFSIZE = 1 << 20
+
+# Chunk size for draining Hindsight output and minimum seconds between progress events.
+_READ_CHUNK_SIZE = 64 * 1024
+_PROGRESS_EVENT_INTERVAL = 0.5
+# Write buffer for the Hindsight run log and minimum seconds between flushes.
+_LOG_BUFSIZE = 1 << 20
+_LOG_FLUSH_INTERVAL = 1.0
+# Bytes of Hindsight output kept in memory to quote when a run fails.
+_LOG_TAIL_BYTES = 2048
+# Files unlinked per task when removing the extracted tree.
+_RMTREE_BATCH_SIZE = 256
+
 log_root = Logger()
 logger = log_root.get_logger(__name__, get_task_logger(__name__))
 
 
+def _unlink_all(paths: List[str]) -> None:
+    for path in paths:
+        os.unlink(path)
+
+
+def _parallel_rmtree(path: str, workers: int = 8) -> None:
+    """Remove a directory tree, unlinking files from a thread pool.
+
+    Files are unlinked in batches across workers; directories are then removed bottom-up
+    in the calling thread. Falls back to shutil.rmtree(ignore_errors=True) on any error.
+    """
+    try:
+        directories = []
+        futures = []
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for dirpath, dirnames, filenames in os.walk(path, topdown=False):
+                # Symlinked directories show up in dirnames but must be unlinked, not rmdir'd.
+                files = [os.path.join(dirpath, name) for name in filenames]
+                files.extend(
+                    os.path.join(dirpath, name) for name in dirnames if os.path.islink(os.path.join(dirpath, name))
+                )
+                for start in range(0, len(files), _RMTREE_BATCH_SIZE):
+                    futures.append(pool.submit(_unlink_all, files[start : start + _RMTREE_BATCH_SIZE]))
+                directories.append(dirpath)
+
+        for future in futures:
+            future.result()
+        for directory in directories:
+            os.rmdir(directory)
+    except Exception as exc:
+        logger.warning("Parallel removal of %s failed (%s); falling back to shutil.rmtree.", path, exc)
+        shutil.rmtree(path, ignore_errors=True)
+
+
 def _validate_single_zip(input_files: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], str]:
     """Ensure exactly one ZIP archive is provided and return it with a display name."""
     if not input_files:
@@ -66,13 +129,228 @@ def _validate_single_zip(input_files: List[Dict[str, Any]]) -> Tuple[Dict[str, A
     return input_file, display_name
 
 
+def _safe_member_target(export_directory: str, member_name: str) -> Optional[str]:
+    """Map a ZIP member name onto a path inside export_directory, or None if it escapes.
+
+    Leading separators are dropped so absolute names land under the export root. A drive
+    component such as 'C:' is kept as an ordinary directory name, as zipfile does on POSIX.
+    """
+    parts = [p for p in member_name.replace("\\", "/").split("/") if p not in ("", ".")]
+    if not parts or ".." in parts:
+        return None
+    return os.path.join(export_directory, *parts)
+
+
+def _is_dir_member(info: zipfile.ZipInfo) -> bool:
+    """Return whether a member is a directory entry, accepting Windows-style trailing '\\'."""
+    return info.filename.endswith(("/", "\\"))
+
+
+def _open_archive_for_streaming(path: str):
+    """Open the archive for reading and hint the kernel that it is streamed once.
+
+    Sequential advice widens readahead and NOREUSE lets the pages be dropped early.
+    posix_fadvise is advisory and not available on every platform, so failures are ignored.
+    """
+    archive_fh = open(path, "rb")
+    try:
+        fd = archive_fh.fileno()
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_NOREUSE)
+    except (AttributeError, OSError):
+        pass
+    return archive_fh
+
+
+def _select_profile_members(infolist: List[zipfile.ZipInfo], suffix_parts: Tuple[str, ...]) -> List[zipfile.ZipInfo]:
+    """Return the members inside the profile directory and the files directly beside it.
+
+    Sibling files (e.g. 'User Data/Local State') are kept because Hindsight reads them
+    alongside the profile.
+    """
+    folded = [p.casefold() for p in suffix_parts]
+    profile_marker = "/" + "/".join(folded) + "/"
+    parent_marker = "/" + "/".join(folded[:-1]) + "/" if len(folded) > 1 else None
+
+    selected = []
+    for info in infolist:
+        name = "/" + info.filename.replace("\\", "/").casefold()
+        if profile_marker in name:
+            selected.append(info)
+            continue
+        if parent_marker and not _is_dir_member(info):
+            idx = name.rfind(parent_marker)
+            if idx != -1 and "/" not in name[idx + len(parent_marker) :]:
+                selected.append(info)
+    return selected
+
+
+def _extract_zip_inproc(
+    input_file: Dict[str, Any],
+    output_path: str,
+    password: Optional[str],
+    suffix_parts: Optional[Tuple[str, ...]] = None,
+) -> Tuple[str, str]:
+    """Extract a ZIP archive in-process and return the command string and export directory.
+
+    The central directory is read once and the directory tree is created up-front in
+    the calling thread; member decompression is then fanned out over a thread pool
+    (zlib releases the GIL). ZipFile objects are not thread-safe, so each worker keeps
+    its own handle on the archive. No per-file fsync is issued.
+
+    When suffix_parts is given, only the members belonging to that profile are extracted;
+    if none match, the whole archive is extracted.
+    """
+    archive_path = input_file["path"]
+    export_directory = os.path.join(output_path, uuid4().hex)
+    os.makedirs(export_directory)
+    pwd = password.encode("utf-8") if password else None
+
+    try:
+        with zipfile.ZipFile(archive_path) as zf:
+            infolist = zf.infolist()
+
+        if suffix_parts:
+            selected = _select_profile_members(infolist, suffix_parts)
+            if selected:
+                logger.info("Extracting %s of %s archive members for the profile.", len(selected), len(infolist))
+                infolist = selected
+            else:
+                logger.info("No archive members match the profile hint; extracting everything.")
+
+        jobs = []
+        created_dirs = {export_directory}
+        for info in infolist:
+            target = _safe_member_target(export_directory, info.filename)
+            if target is None:
+                logger.warning("Skipping unsafe archive member: %s", info.filename)
+                continue
+
+            is_dir = _is_dir_member(info)
+            directory = target if is_dir else os.path.dirname(target)
+            if directory not in created_dirs:
+                os.makedirs(directory, exist_ok=True)
+                created_dirs.add(directory)
+            if not is_dir:
+                jobs.append((info, target))
+
+        worker_state = threading.local()
+        handles: List[Any] = []
+        handles_lock = threading.Lock()
+
+        def _extract_one(info: zipfile.ZipInfo, target: str) -> None:
+            zf = getattr(worker_state, "zf", None)
+            if zf is None:
+                # ZipFile does not close a file object it was handed, so track both.
+                archive_fh = _open_archive_for_streaming(archive_path)
+                zf = worker_state.zf = zipfile.ZipFile(archive_fh)
+                with handles_lock:
+                    handles.extend((zf, archive_fh))
+            # Every member, stored or compressed, goes through ZipExtFile so its CRC-32 is checked.
+            with zf.open(info, pwd=pwd) as src, open(target, "wb") as dst:
+                shutil.copyfileobj(src, dst, length=_COPY_BUFSIZE)
+
+        # Bound the number of queued members so huge archives don't materialise
+        # millions of pending futures, and stop feeding the pool after a failure.
+        slots = threading.BoundedSemaphore(_EXTRACT_WORKERS * 4)
+        failed = threading.Event()
+        futures = []
+
+        def _on_done(future) -> None:
+            if future.exception() is not None:
+                failed.set()
+            slots.release()
+
+        try:
+            with ThreadPoolExecutor(max_workers=_EXTRACT_WORKERS) as pool:
+                for info, target in jobs:
+                    slots.acquire()
+                    if failed.is_set():
+                        slots.release()
+                        break
+                    future = pool.submit(_extract_one, info, target)
+                    future.add_done_callback(_on_done)
+                    futures.append(future)
+        finally:
+            for handle in handles:
+                handle.close()
+
+        for future in futures:
+            future.result()
+    except Exception:
+        # Leave nothing half-extracted behind for the caller to trip over.
+        _parallel_rmtree(export_directory)
+        raise
+
+    return f"zipfile extract {archive_path}", export_directory
+
+
+def _mount_zip(input_file: Dict[str, Any], output_path: str, password: Optional[str]) -> Tuple[str, str]:
+    """Mount the ZIP with ratarmount and return the command string and mountpoint.
+
+    Members are decompressed on demand as Hindsight reads them, so only the selected
+    profile is ever inflated.
+    """
+    archive_path = input_file["path"]
+    mountpoint = os.path.join(output_path, uuid4().hex)
+    os.makedirs(mountpoint)
+
+    # Keep the member index in memory; by default ratarmount writes <input>.index.sqlite
+    # next to large archives, i.e. into OpenRelik's shared input storage.
+    cmd = ["ratarmount", "--index-file", ":memory:"]
+    if password:
+        cmd.extend(["--password", password])
+    cmd.extend([archive_path, mountpoint])
+
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=_MOUNT_TIMEOUT)
+    except subprocess.TimeoutExpired as exc:
+        if os.path.ismount(mountpoint):
+            _unmount(mountpoint)
+        os.rmdir(mountpoint)
+        raise RuntimeError(f"ratarmount timed out after {_MOUNT_TIMEOUT}s") from exc
+    if result.returncode != 0:
+        os.rmdir(mountpoint)
+        raise RuntimeError(f"ratarmount failed (exit {result.returncode}): {result.stderr.strip()}")
+
+    # Never echo the password back in the command string.
+    return f"ratarmount {archive_path} {mountpoint}", mountpoint
+
+
+def _unmount(mountpoint: str) -> bool:
+    """Unmount a ratarmount mountpoint, returning whether it succeeded."""
+    try:
+        result = subprocess.run(
+            ["ratarmount", "-u", mountpoint], capture_output=True, text=True, timeout=_MOUNT_TIMEOUT
+        )
+    except subprocess.TimeoutExpired:
+        logger.error("Timed out unmounting %s", mountpoint)
+        return False
+    if result.returncode != 0:
+        logger.error("Failed to unmount %s: %s", mountpoint, result.stderr.strip())
+        return False
+    return True
+
+
+def _release_export_directory(export_directory: str) -> None:
+    """Unmount (if mounted) and remove the directory holding the archive contents."""
+    if os.path.ismount(export_directory) and not _unmount(export_directory):
+        return
+    _parallel_rmtree(export_directory)
+
+
 def _extract_input_archive(
     input_file: Dict[str, Any],
     output_path: str,
     display_name: str,
     archive_password: Optional[str],
+    profile_hint: Optional[str] = None,
 ):
-    """Extract the archive and return the command string, export directory, and log file."""
+    """Extract the archive and return the command string, export directory, and log file.
+
+    When profile_hint is given, ZIP inputs are extracted selectively to that profile.
+    """
+    suffix_parts = _suffix_for_hint(profile_hint.strip()) if profile_hint else None
     log_file = create_output_file(
         output_path,
         display_name=f"extract_{display_name}.log",
@@ -81,15 +359,30 @@ def _extract_input_archive(
     logger.info("Starting archive extraction for %s", display_name)
 
     try:
-        command_string, export_directory = extract_archive(
-            input_file,
-            output_path,
-            log_file.path,
-            [],
-            archive_password,
-        )
+        command_string = export_directory = None
+        if _MOUNT_ZIP and shutil.which("ratarmount") and zipfile.is_zipfile(input_file["path"]):
+            try:
+                command_string, export_directory = _mount_zip(input_file, output_path, archive_password)
+            except RuntimeError as exc:
+                logger.warning("Mounting archive failed (%s); extracting instead.", exc)
+        if export_directory is None and zipfile.is_zipfile(input_file["path"]):
+            try:
+                command_string, export_directory = _extract_zip_inproc(
+                    input_file, output_path, archive_password, suffix_parts
+                )
+            except NotImplementedError as exc:
+                # e.g. AES-encrypted or exotic compression methods; 7z can handle these.
+                logger.info("In-process extraction unsupported (%s); falling back to 7z.", exc)
+        if export_directory is None:
+            command_string, export_directory = extract_archive(
+                input_file,
+                output_path,
+                log_file.path,
+                [],
+                archive_password,
+            )
     except Exception as exc:
-        logger.error(f"Failed to extract archive '{display_name}': {exc}")
+        logger.error("Failed to extract archive '%s': %s", display_name, exc)
         message = str(exc).lower()
         if not archive_password and ("password" in message or "protected" in message or "execution error" in message):
             raise ValueError("Archive appears to be password-protected; please supply a password.") from exc
@@ -101,27 +394,52 @@ def _extract_input_archive(
     return command_string, export_directory, log_file
 
 
-def find_browser_profile(export_directory: str, profile_hint: str) -> str:
-    """Resolve the provided profile path hint inside the extracted tree.
+def _match_profile_suffix(path: str, states: Tuple[str, ...], active: Tuple[int, ...]) -> Optional[str]:
+    """Depth-first search for a directory whose trailing components equal states.
+
+    active holds the suffix positions reachable at path; position 0 is always live so
+    the suffix may begin under any collection wrapper folder. Returns the first match
+    in sorted traversal order, or None.
+    """
+    try:
+        with os.scandir(path) as it:
+            entries = sorted(
+                (e for e in it if e.is_dir(follow_symlinks=False)),
+                key=lambda e: e.name,
+            )
+    except OSError:
+        return None
+
+    final = len(states)
+    for entry in entries:
+        name = entry.name.casefold()
+        advanced = [i + 1 for i in active if states[i] == name]
+        if final in advanced:
+            return entry.path
+        found = _match_profile_suffix(entry.path, states, (0, *advanced))
+        if found is not None:
+            return found
+    return None
+
+
+@lru_cache(maxsize=128)
+def _suffix_for_hint(profile_hint: str) -> Tuple[str, ...]:
+    """Normalize a Windows profile path hint into the path components to search for.
 
     Assumes a proper Windows-style path starting with a drive letter,
     e.g., C:\\Users\\Ryan\\AppData\\Local\\Google\\Chrome\\User Data\\Default.
-    Trims whitespace and searches for the tail (starting at Users) anywhere under export_directory.
+    The drive is dropped and, when present, everything before 'Users' is trimmed.
     """
     if not profile_hint:
         raise ValueError("A browser profile path is required.")
 
-    trimmed = profile_hint.strip()
-    normalized = PureWindowsPath(trimmed)
-    drive = normalized.drive
-    if not drive:
+    trimmed = profile_hint.strip().replace("\\", "/")
+    if len(trimmed) < 2 or trimmed[1] != ":" or not trimmed[0].isalpha():
         logger.error("Profile hint missing drive letter: %s", profile_hint)
         raise ValueError("Browser profile path must start with a drive letter (e.g., C:\\...).")
 
     # Remove the drive component; work with the remainder.
-    tail_parts = list(normalized.parts)
-    if tail_parts and tail_parts[0].endswith(":"):
-        tail_parts = tail_parts[1:]
+    tail_parts = [p for p in trimmed[2:].split("/") if p not in ("", ".")]
     if not tail_parts:
         raise ValueError("Browser profile path is invalid or empty after drive removal.")
 
@@ -131,19 +449,26 @@ def find_browser_profile(export_directory: str, profile_hint: str) -> str:
         idx = lower_parts.index("users")
         tail_parts = tail_parts[idx:]
 
-    relative_suffix = Path(*tail_parts)
-    logger.info("Searching for profile hint suffix: %s", relative_suffix.as_posix())
-    search_glob = f"**/{relative_suffix.as_posix()}"
-    base = Path(export_directory)
-    candidates = [p for p in base.glob(search_glob) if p.is_dir()]
+    return tuple(tail_parts)
+
+
+def find_browser_profile(export_directory: str, profile_hint: str) -> str:
+    """Resolve the provided profile path hint inside the extracted tree.
+
+    Searches for the tail of the hint (starting at Users) anywhere under export_directory.
+    """
+    tail_parts = _suffix_for_hint((profile_hint or "").strip())
+
+    logger.info("Searching for profile hint suffix: %s", "/".join(tail_parts))
+    states = tuple(p.casefold() for p in tail_parts)
+    match = _match_profile_suffix(export_directory, states, (0,))
 
-    if not candidates:
+    if match is None:
         logger.error("Profile hint not found: %s", profile_hint)
         raise ValueError(f"Browser profile path not found in archive: {profile_hint}")
 
-    match = sorted(candidates)[0]
     logger.info("Profile hint resolved to: %s", match)
-    return str(match)
+    return match
 
 
 def _build_and_run_hindsight(profile_path: str, output_dir: str, log_path: str, send_event) -> Tuple[List[str], str]:
@@ -163,29 +488,62 @@ def _build_and_run_hindsight(profile_path: str, output_dir: str, log_path: str,
     process = subprocess.Popen(
         cmd,
         stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
+        stderr=subprocess.PIPE,
         cwd=output_dir,
-        text=True,
-        bufsize=1,
+        bufsize=0,
     )
 
-    with open(log_path, "w", encoding="utf-8") as log_fh:
-        for line in process.stdout:
-            log_fh.write(line)
-            log_fh.flush()
-            send_event("task-progress", data=None)
+    # Multiplex stdout and stderr, draining raw chunks as they become readable, and
+    # throttle progress events; a chatty run would otherwise cost one broker round-trip
+    # per output line.
+    last_event = None
+    last_flush = time.monotonic()
+    tail = bytearray()
+    with selectors.DefaultSelector() as selector, open(log_path, "wb", buffering=_LOG_BUFSIZE) as log_fh:
+        for pipe in (process.stdout, process.stderr):
+            selector.register(pipe, selectors.EVENT_READ)
+
+        while selector.get_map():
+            for key, _ in selector.select(timeout=_PROGRESS_EVENT_INTERVAL):
+                chunk = os.read(key.fd, _READ_CHUNK_SIZE)
+                if not chunk:
+                    selector.unregister(key.fileobj)
+                    key.fileobj.close()
+                    continue
+                log_fh.write(chunk)
+                # Keep only the last few KiB in memory for the failure message.
+                tail += chunk[-_LOG_TAIL_BYTES:]
+                del tail[:-_LOG_TAIL_BYTES]
+
+            now = time.monotonic()
+            if last_event is None or now - last_event >= _PROGRESS_EVENT_INTERVAL:
+                send_event("task-progress", data=None)
+                last_event = now
+            # Flush on a timer rather than per write so the log can still be tailed live.
+            if now - last_flush >= _LOG_FLUSH_INTERVAL:
+                log_fh.flush()
+                last_flush = now
 
     process.wait()
 
     if process.returncode != 0:
-        with open(log_path, "r", encoding="utf-8") as log_fh:
-            tail = log_fh.read()[-2000:]
         logger.error("Hindsight failed with exit %s", process.returncode)
-        raise RuntimeError(f"Hindsight failed (exit {process.returncode}). Tail of log: {tail}")
+        raise RuntimeError(
+            f"Hindsight failed (exit {process.returncode}). Tail of log: {tail.decode('utf-8', 'replace')}"
+        )
 
     return cmd, human_readable
 
 
+def _move_report(src: str, dst: str) -> None:
+    """Move the generated report into place, renaming atomically when on the same filesystem."""
+    dst_dir = os.path.dirname(dst) or os.curdir
+    if os.stat(src).st_dev == os.stat(dst_dir).st_dev:
+        os.replace(src, dst)
+    else:
+        shutil.move(src, dst)
+
+
 @signals.task_prerun.connect
 def on_task_prerun(sender, task_id, task, args, kwargs, **_):
     log_root.bind(
@@ -213,7 +571,7 @@ def hindsight(
         raise ValueError("Browser Profile is required and must point to a Default folder to parse.")
 
     log_root.bind(workflow_id=workflow_id)
-    logger.info(f"Starting {TASK_NAME} for workflow {workflow_id}")
+    logger.info("Starting %s for workflow %s", TASK_NAME, workflow_id)
 
     input_files = get_input_files(pipe_result, input_files or [])
     input_file, display_name = _validate_single_zip(input_files)
@@ -224,60 +582,55 @@ def hindsight(
         output_path,
         display_name,
         archive_password,
+        browser_profile_hint,
     )
     logger.info("Archive extracted (task) for %s -> %s", display_name, export_directory)
 
-    profile_path = find_browser_profile(export_directory, browser_profile_hint)
-    logger.info(f"Resolved browser profile path: {profile_path}")
-
-    # Run Hindsight in the output directory so its default-named report lands there.
-    timestamp = datetime.now(timezone.utc)
-    # Capture Hindsight stdout into a log file for UI visibility and debugging.
-    timestamp_str = timestamp.strftime("%Y%m%dT%H%M%SZ")
-    log_file = create_output_file(
-        output_path,
-        display_name=f"hindsight_{timestamp_str}_log.txt",
-    )
-
     try:
-        cmd, human_cmd = _build_and_run_hindsight(profile_path, output_path, log_file.path, self.send_event)
-    except Exception:
-        output_files.append(log_file.to_dict())
-        if export_directory and Path(export_directory).exists():
-            shutil.rmtree(export_directory, ignore_errors=True)
-        raise
-    logger.info(f"Executed Hindsight command: {human_cmd}")
-
-    report_candidates = sorted(
-        Path(output_path).glob("Hindsight Report *.xlsx"),
-        key=lambda p: p.stat().st_mtime,
-        reverse=True,
-    )
-
-    if report_candidates:
-        generated_report = report_candidates[0]
-        logger.info("Hindsight generated report: %s", generated_report)
-        output_file = create_output_file(
+        profile_path = find_browser_profile(export_directory, browser_profile_hint)
+        logger.info("Resolved browser profile path: %s", profile_path)
+
+        # Run Hindsight in the output directory so its default-named report lands there.
+        timestamp = datetime.now(timezone.utc)
+        # Capture Hindsight stdout into a log file for UI visibility and debugging.
+        timestamp_str = timestamp.strftime("%Y%m%dT%H%M%SZ")
+        log_file = create_output_file(
             output_path,
-            display_name=generated_report.name,
-            data_type="openrelik:hindsight:report",
+            display_name=f"hindsight_{timestamp_str}_log.txt",
         )
-        shutil.move(generated_report, output_file.path)
-        output_files.append(output_file.to_dict())
-    else:
-        # Surface the log so the user can inspect what went wrong.
-        logger.error("Hindsight did not produce a report file; exposing log to user.")
-        output_files.append(log_file.to_dict())
-        if export_directory and Path(export_directory).exists():
-            shutil.rmtree(export_directory, ignore_errors=True)
-        raise RuntimeError("Hindsight did not produce a report file. See the attached log for details.")
 
-    # Always include the run log on success.
-    output_files.append(log_file.to_dict())
-
-    # Clean up extracted data to leave only the original ZIP and outputs.
-    if export_directory and Path(export_directory).exists():
-        shutil.rmtree(export_directory, ignore_errors=True)
+        try:
+            cmd, human_cmd = _build_and_run_hindsight(profile_path, output_path, log_file.path, self.send_event)
+        except Exception:
+            output_files.append(log_file.to_dict())
+            raise
+        logger.info("Executed Hindsight command: %s", human_cmd)
+
+        with os.scandir(output_path) as it:
+            candidates = [e for e in it if e.name.startswith("Hindsight Report ") and e.name.endswith(".xlsx")]
+        generated_report = max(candidates, key=lambda e: e.stat().st_mtime, default=None)
+
+        if generated_report is not None:
+            logger.info("Hindsight generated report: %s", generated_report.path)
+            output_file = create_output_file(
+                output_path,
+                display_name=generated_report.name,
+                data_type="openrelik:hindsight:report",
+            )
+            _move_report(generated_report.path, output_file.path)
+            output_files.append(output_file.to_dict())
+        else:
+            # Surface the log so the user can inspect what went wrong.
+            logger.error("Hindsight did not produce a report file; exposing log to user.")
+            output_files.append(log_file.to_dict())
+            raise RuntimeError("Hindsight did not produce a report file. See the attached log for details.")
+
+        # Always include the run log on success.
+        output_files.append(log_file.to_dict())
+    finally:
+        # Clean up extracted data to leave only the original ZIP and outputs.
+        if export_directory:
+            _release_export_directory(export_directory)
 
     return create_task_result(
         output_files=output_files,
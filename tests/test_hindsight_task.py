@@ -1,9 +1,11 @@
 """Unit tests for hindsight_task helpers."""
 
+import os
 import shutil
 import tempfile
+import zipfile
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 import pytest
 
@@ -121,6 +123,69 @@ def test_extract_and_find_edge_profile_from_second_artifact():
                 Path(log_file.path).unlink(missing_ok=True)
 
 
+def _write_triage_zip(zip_path: Path, members: List[str]) -> None:
+    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name in members:
+            if name.endswith(("/", "\\")):
+                zf.writestr(name, "")
+            else:
+                zf.writestr(name, f"contents of {name}")
+
+
+def test_extract_zip_inproc_streams_members_and_skips_unsafe_paths():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        zip_path = Path(tmpdir) / "triage.zip"
+        _write_triage_zip(
+            zip_path,
+            [
+                "C/Users/Ryan/AppData/Local/Google/Chrome/User Data/Default/",
+                "C/Users/Ryan/AppData/Local/Google/Chrome/User Data/Default/History",
+                "C/Windows/System32/config/SYSTEM",
+                "../escape.txt",
+            ],
+        )
+        output_path = Path(tmpdir) / "out"
+        output_path.mkdir()
+
+        _, export_dir, _ = ht._extract_input_archive(
+            input_file={"path": str(zip_path), "display_name": zip_path.name},
+            output_path=str(output_path),
+            display_name=zip_path.name,
+            archive_password=None,
+        )
+
+        export = Path(export_dir)
+        history = export / "C/Users/Ryan/AppData/Local/Google/Chrome/User Data/Default/History"
+        assert history.read_text() == "contents of C/Users/Ryan/AppData/Local/Google/Chrome/User Data/Default/History"
+        assert (export / "C/Windows/System32/config/SYSTEM").is_file()
+        assert not (output_path / "escape.txt").exists()
+        assert not (Path(tmpdir) / "escape.txt").exists()
+
+        profile = ht.find_browser_profile(
+            export_directory=export_dir,
+            profile_hint=r"C:\Users\Ryan\AppData\Local\Google\Chrome\User Data\Default",
+        )
+        assert profile.endswith("Chrome/User Data/Default")
+
+
+def test_extract_zip_inproc_parallel_members_match_archive(monkeypatch):
+    monkeypatch.setattr(ht, "_EXTRACT_WORKERS", 4)
+    members = [f"C/Users/Ryan/AppData/Local/Temp/file_{i:03d}.txt" for i in range(200)]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        zip_path = Path(tmpdir) / "many.zip"
+        _write_triage_zip(zip_path, members)
+
+        _, export_dir = ht._extract_zip_inproc(
+            {"path": str(zip_path), "display_name": zip_path.name},
+            tmpdir,
+            None,
+        )
+
+        for name in members:
+            assert (Path(export_dir) / name).read_text() == f"contents of {name}"
+
+
 def test_find_profile_from_hint_raises_when_missing():
     with tempfile.TemporaryDirectory() as tmpdir:
         base = Path(tmpdir)
@@ -132,15 +197,49 @@ def test_find_profile_from_hint_raises_when_missing():
             )
 
 
+def test_find_profile_matches_case_insensitively_and_picks_first_sorted():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        base = Path(tmpdir)
+        second = base / "b_collection" / "C" / "Users" / "Ryan" / "AppData" / "Local" / "Google" / "Chrome" / "User Data" / "Default"
+        first = base / "a_collection" / "C" / "users" / "ryan" / "AppData" / "Local" / "Google" / "Chrome" / "User Data" / "Default"
+        second.mkdir(parents=True)
+        first.mkdir(parents=True)
+
+        profile = ht.find_browser_profile(
+            export_directory=str(base),
+            profile_hint=r"C:\Users\Ryan\AppData\Local\Google\Chrome\User Data\Default",
+        )
+        assert Path(profile) == first
+
+
+def test_find_profile_restarts_suffix_after_partial_match():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        base = Path(tmpdir)
+        profile_dir = base / "Users" / "Users" / "Ryan" / "AppData" / "Local" / "Google" / "Chrome" / "User Data" / "Default"
+        profile_dir.mkdir(parents=True)
+        (base / "Users" / "Ryan" / "AppData").mkdir(parents=True)
+
+        profile = ht.find_browser_profile(
+            export_directory=str(base),
+            profile_hint=r"C:\Users\Ryan\AppData\Local\Google\Chrome\User Data\Default",
+        )
+        assert Path(profile) == profile_dir
+
+
+def _prefilled_pipe(lines: List[str]):
+    read_fd, write_fd = os.pipe()
+    with os.fdopen(write_fd, "wb") as writer:
+        writer.write("".join(lines).encode("utf-8"))
+    return os.fdopen(read_fd, "rb", buffering=0)
+
+
 class _FakeProcess:
-    def __init__(self, lines: List[str], returncode: int = 0):
-        self._lines = lines
-        self.returncode = returncode
-        self.stdout = self
+    """Stand-in for Popen whose stdout/stderr are real pipes pre-filled with the given lines."""
 
-    def __iter__(self):
-        for line in self._lines:
-            yield line
+    def __init__(self, lines: List[str], returncode: int = 0, stderr_lines: Optional[List[str]] = None):
+        self.returncode = returncode
+        self.stdout = _prefilled_pipe(lines)
+        self.stderr = _prefilled_pipe(stderr_lines or [])
 
     def wait(self):
         return self.returncode
@@ -170,8 +269,8 @@ def test_build_and_run_hindsight_emits_progress_and_writes_log(monkeypatch):
         assert "hindsight.py" in cmd[0]
         assert human.startswith("hindsight.py -i")
         assert log_path.read_text().strip().splitlines() == [l.strip() for l in lines]
-        # Progress events emitted per line.
-        assert len(events) == len(lines)
+        # Progress events are throttled rather than emitted per line.
+        assert events == ["task-progress"]
 
 
 def test_build_and_run_hindsight_failure_raises_and_logs(monkeypatch):
@@ -179,13 +278,13 @@ def test_build_and_run_hindsight_failure_raises_and_logs(monkeypatch):
         return None
 
     def fake_popen(*args, **kwargs):
-        return _FakeProcess(lines=["oops\n"], returncode=1)
+        return _FakeProcess(lines=[], returncode=1, stderr_lines=["oops\n"])
 
     monkeypatch.setattr(ht.subprocess, "Popen", fake_popen)
 
     with tempfile.TemporaryDirectory() as tmpdir:
         log_path = Path(tmpdir) / "log.txt"
-        with pytest.raises(RuntimeError):
+        with pytest.raises(RuntimeError, match="oops"):
             ht._build_and_run_hindsight(
                 profile_path="C:/Users/Default",
                 output_dir=tmpdir,
@@ -193,3 +292,321 @@ def test_build_and_run_hindsight_failure_raises_and_logs(monkeypatch):
                 send_event=fake_send_event,
             )
         assert "oops" in log_path.read_text()
+
+
+def test_build_and_run_hindsight_failure_quotes_bounded_tail(monkeypatch):
+    def fake_popen(*args, **kwargs):
+        return _FakeProcess(lines=["x" * 10000, "last line\n"], returncode=2)
+
+    monkeypatch.setattr(ht.subprocess, "Popen", fake_popen)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        log_path = Path(tmpdir) / "log.txt"
+        with pytest.raises(RuntimeError) as excinfo:
+            ht._build_and_run_hindsight(
+                profile_path="C:/Users/Default",
+                output_dir=tmpdir,
+                log_path=str(log_path),
+                send_event=lambda name, data=None: None,
+            )
+        tail = str(excinfo.value).split("Tail of log: ", 1)[1]
+        assert tail.endswith("last line\n")
+        assert len(tail) == ht._LOG_TAIL_BYTES
+
+
+def test_move_report_renames_within_output_directory():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        src = Path(tmpdir) / "Hindsight Report (2025-01-01T00-00-00).xlsx"
+        src.write_bytes(b"report")
+        dst = Path(tmpdir) / "0123abcd.xlsx"
+
+        ht._move_report(str(src), str(dst))
+
+        assert not src.exists()
+        assert dst.read_bytes() == b"report"
+
+
+def test_hindsight_task_cleans_up_extraction_when_profile_missing():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        zip_path = Path(tmpdir) / "triage.zip"
+        _write_triage_zip(zip_path, ["C/Windows/System32/config/SYSTEM"])
+        output_path = Path(tmpdir) / "out"
+        output_path.mkdir()
+
+        with pytest.raises(ValueError, match="not found in archive"):
+            ht.hindsight.run(
+                input_files=[{"path": str(zip_path), "display_name": zip_path.name}],
+                output_path=str(output_path),
+                workflow_id="wf",
+                task_config={"browser_profile": r"C:\Users\Ryan\AppData\Local\Google\Chrome\User Data\Default"},
+            )
+
+        assert not any(p.is_dir() for p in output_path.iterdir())
+
+
+def test_parallel_rmtree_removes_nested_tree_and_tolerates_missing_path():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir) / "export"
+        for i in range(3):
+            nested = root / f"dir_{i}" / "sub"
+            nested.mkdir(parents=True)
+            for j in range(300):
+                (nested / f"f{j}").write_bytes(b"x")
+        (root / "link").symlink_to(root / "dir_0")
+
+        ht._parallel_rmtree(str(root), workers=4)
+        assert not root.exists()
+
+        ht._parallel_rmtree(str(root))
+
+
+def test_extract_input_archive_falls_back_when_mount_fails(monkeypatch):
+    monkeypatch.setattr(ht, "_MOUNT_ZIP", True)
+    monkeypatch.setattr(ht.shutil, "which", lambda name: f"/usr/bin/{name}")
+    monkeypatch.setattr(
+        ht.subprocess,
+        "run",
+        lambda *args, **kwargs: ht.subprocess.CompletedProcess(args, 1, stdout="", stderr="fuse: device not found"),
+    )
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        zip_path = Path(tmpdir) / "triage.zip"
+        _write_triage_zip(zip_path, ["C/Users/Ryan/NTUSER.DAT"])
+
+        command, export_dir, _ = ht._extract_input_archive(
+            input_file={"path": str(zip_path), "display_name": zip_path.name},
+            output_path=tmpdir,
+            display_name=zip_path.name,
+            archive_password=None,
+        )
+
+        assert not command.startswith("ratarmount")
+        assert (Path(export_dir) / "C/Users/Ryan/NTUSER.DAT").is_file()
+
+
+def test_extract_input_archive_only_extracts_hinted_profile():
+    profile = "C/Users/Ryan/AppData/Local/Google/Chrome/User Data/Default"
+    with tempfile.TemporaryDirectory() as tmpdir:
+        zip_path = Path(tmpdir) / "triage.zip"
+        _write_triage_zip(
+            zip_path,
+            [
+                f"{profile}/History",
+                f"{profile}/Network/Cookies",
+                "C/Users/Ryan/AppData/Local/Google/Chrome/User Data/Local State",
+                "C/Users/Ryan/AppData/Local/Google/Chrome/User Data/Profile 1/History",
+                "C/Windows/System32/config/SYSTEM",
+            ],
+        )
+
+        _, export_dir, _ = ht._extract_input_archive(
+            input_file={"path": str(zip_path), "display_name": zip_path.name},
+            output_path=tmpdir,
+            display_name=zip_path.name,
+            archive_password=None,
+            profile_hint=r"C:\Users\ryan\AppData\Local\Google\Chrome\User Data\Default",
+        )
+
+        export = Path(export_dir)
+        assert (export / profile / "History").is_file()
+        assert (export / profile / "Network" / "Cookies").is_file()
+        assert (export / profile).parent.joinpath("Local State").is_file()
+        assert not (export / profile).parent.joinpath("Profile 1").exists()
+        assert not (export / "C" / "Windows").exists()
+
+
+def test_suffix_for_hint_is_memoized():
+    ht._suffix_for_hint.cache_clear()
+    hint = r"C:\Users\Ryan\AppData\Local\Google\Chrome\User Data\Default"
+
+    first = ht._suffix_for_hint(hint)
+    second = ht._suffix_for_hint(hint)
+
+    assert first == ("Users", "Ryan", "AppData", "Local", "Google", "Chrome", "User Data", "Default")
+    assert second is first
+    assert ht._suffix_for_hint.cache_info().hits == 1
+
+
+def test_hindsight_task_moves_newest_report_into_outputs(monkeypatch):
+    def fake_run(profile_path, output_dir, log_path, send_event):
+        older = Path(output_dir) / "Hindsight Report (old).xlsx"
+        older.write_bytes(b"old")
+        os.utime(older, (0, 0))
+        (Path(output_dir) / "Hindsight Report (new).xlsx").write_bytes(b"new")
+        Path(log_path).write_text("done\n")
+        return ["hindsight.py", "-i", profile_path], f'hindsight.py -i "{profile_path}"'
+
+    monkeypatch.setattr(ht, "_build_and_run_hindsight", fake_run)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        zip_path = Path(tmpdir) / "triage.zip"
+        _write_triage_zip(zip_path, ["C/Users/Ryan/AppData/Local/Google/Chrome/User Data/Default/History"])
+        output_path = Path(tmpdir) / "out"
+        output_path.mkdir()
+
+        ht.hindsight.run(
+            input_files=[{"path": str(zip_path), "display_name": zip_path.name}],
+            output_path=str(output_path),
+            workflow_id="wf",
+            task_config={"browser_profile": r"C:\Users\Ryan\AppData\Local\Google\Chrome\User Data\Default"},
+        )
+
+        names = sorted(p.name for p in output_path.iterdir())
+        assert "Hindsight Report (new).xlsx" not in names
+        assert "Hindsight Report (old).xlsx" in names
+        moved = [p for p in output_path.iterdir() if p.suffix == ".xlsx" and not p.name.startswith("Hindsight")]
+        assert [p.read_bytes() for p in moved] == [b"new"]
+        assert not any(p.is_dir() for p in output_path.iterdir())
+
+
+def test_suffix_for_hint_normalizes_separators_and_rejects_missing_drive():
+    assert ht._suffix_for_hint(r"c:/Collection\\C\Users\Ryan\.\AppData\\") == ("Users", "Ryan", "AppData")
+    assert ht._suffix_for_hint(r"D:\Profiles\Default") == ("Profiles", "Default")
+    with pytest.raises(ValueError):
+        ht._suffix_for_hint(r"\Users\Ryan\AppData")
+    with pytest.raises(ValueError):
+        ht._suffix_for_hint(r"\\server\share\Users\Ryan")
+    with pytest.raises(ValueError):
+        ht._suffix_for_hint("C:\\")
+
+
+def test_extract_zip_inproc_copies_stored_and_deflated_members():
+    payload = os.urandom(3 * 1024 * 1024)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        zip_path = Path(tmpdir) / "mixed.zip"
+        with zipfile.ZipFile(zip_path, "w") as zf:
+            zf.writestr("stored/History", payload, compress_type=zipfile.ZIP_STORED)
+            zf.writestr("deflated/History", payload, compress_type=zipfile.ZIP_DEFLATED)
+            zf.writestr("stored/empty", b"", compress_type=zipfile.ZIP_STORED)
+
+        _, export_dir = ht._extract_zip_inproc(
+            {"path": str(zip_path), "display_name": zip_path.name},
+            tmpdir,
+            None,
+        )
+
+        export = Path(export_dir)
+        assert (export / "stored" / "History").read_bytes() == payload
+        assert (export / "deflated" / "History").read_bytes() == payload
+        assert (export / "stored" / "empty").read_bytes() == b""
+
+
+def test_extract_zip_inproc_keeps_drive_prefixed_members():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        zip_path = Path(tmpdir) / "drive.zip"
+        _write_triage_zip(
+            zip_path,
+            ["C:/Users/y/AppData/Local/Google/Chrome/User Data/Default/History", "/abs/NTUSER.DAT"],
+        )
+
+        _, export_dir, _ = ht._extract_input_archive(
+            input_file={"path": str(zip_path), "display_name": zip_path.name},
+            output_path=tmpdir,
+            display_name=zip_path.name,
+            archive_password=None,
+        )
+
+        export = Path(export_dir)
+        assert (export / "C:/Users/y/AppData/Local/Google/Chrome/User Data/Default/History").is_file()
+        assert (export / "abs" / "NTUSER.DAT").is_file()
+
+        profile = ht.find_browser_profile(
+            export_directory=export_dir,
+            profile_hint=r"C:\Users\y\AppData\Local\Google\Chrome\User Data\Default",
+        )
+        assert profile.endswith("Chrome/User Data/Default")
+
+
+def test_mount_zip_keeps_index_in_memory_and_sets_timeout(monkeypatch):
+    calls = []
+
+    def fake_run(cmd, **kwargs):
+        calls.append((cmd, kwargs))
+        return ht.subprocess.CompletedProcess(cmd, 0, stdout="", stderr="")
+
+    monkeypatch.setattr(ht.subprocess, "run", fake_run)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        command, mountpoint = ht._mount_zip({"path": "/inputs/triage.zip"}, tmpdir, "secret")
+
+        cmd, kwargs = calls[0]
+        assert cmd[cmd.index("--index-file") + 1] == ":memory:"
+        assert cmd[-2:] == ["/inputs/triage.zip", mountpoint]
+        assert kwargs["timeout"] == ht._MOUNT_TIMEOUT
+        assert "secret" not in command
+
+
+def test_mount_zip_timeout_raises_and_removes_mountpoint(monkeypatch):
+    def fake_run(cmd, **kwargs):
+        raise ht.subprocess.TimeoutExpired(cmd, kwargs["timeout"])
+
+    monkeypatch.setattr(ht.subprocess, "run", fake_run)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with pytest.raises(RuntimeError, match="timed out"):
+            ht._mount_zip({"path": "/inputs/triage.zip"}, tmpdir, None)
+        assert list(Path(tmpdir).iterdir()) == []
+
+
+def test_extract_zip_inproc_rejects_corrupted_stored_member():
+    payload = b"SQLite format 3\x00" + b"A" * 4096
+    with tempfile.TemporaryDirectory() as tmpdir:
+        zip_path = Path(tmpdir) / "corrupt.zip"
+        with zipfile.ZipFile(zip_path, "w") as zf:
+            zf.writestr("C/Users/x/History", payload, compress_type=zipfile.ZIP_STORED)
+
+        data = bytearray(zip_path.read_bytes())
+        idx = data.index(payload) + 100
+        data[idx] ^= 0xFF
+        zip_path.write_bytes(bytes(data))
+
+        output_path = Path(tmpdir) / "out"
+        output_path.mkdir()
+        with pytest.raises(zipfile.BadZipFile, match="CRC"):
+            ht._extract_zip_inproc({"path": str(zip_path), "display_name": zip_path.name}, str(output_path), None)
+        assert list(output_path.iterdir()) == []
+
+
+def test_extract_zip_inproc_handles_backslash_directory_entries():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        zip_path = Path(tmpdir) / "windows.zip"
+        _write_triage_zip(zip_path, ["C\\Users\\", "C\\Users\\R\\NTUSER.DAT"])
+
+        _, export_dir = ht._extract_zip_inproc(
+            {"path": str(zip_path), "display_name": zip_path.name},
+            tmpdir,
+            None,
+        )
+
+        export = Path(export_dir)
+        assert (export / "C" / "Users").is_dir()
+        assert (export / "C" / "Users" / "R" / "NTUSER.DAT").read_text() == "contents of C\\Users\\R\\NTUSER.DAT"
+
+
+def test_extract_input_archive_selects_profile_with_backslash_directory_entries():
+    user_data = "C\\Users\\R\\AppData\\Local\\Google\\Chrome\\User Data\\"
+    with tempfile.TemporaryDirectory() as tmpdir:
+        zip_path = Path(tmpdir) / "windows.zip"
+        _write_triage_zip(
+            zip_path,
+            [
+                user_data,
+                user_data + "Crashpad\\",
+                user_data + "Local State",
+                user_data + "Default\\",
+                user_data + "Default\\History",
+            ],
+        )
+
+        _, export_dir, _ = ht._extract_input_archive(
+            input_file={"path": str(zip_path), "display_name": zip_path.name},
+            output_path=tmpdir,
+            display_name=zip_path.name,
+            archive_password=None,
+            profile_hint=r"C:\Users\R\AppData\Local\Google\Chrome\User Data\Default",
+        )
+
+        user_data_dir = Path(export_dir) / "C/Users/R/AppData/Local/Google/Chrome/User Data"
+        assert (user_data_dir / "Default" / "History").is_file()
+        assert (user_data_dir / "Local State").is_file()
+        assert not (user_data_dir / "Crashpad").exists()